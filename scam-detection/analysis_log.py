@@ -0,0 +1,298 @@
+"""
+analysis_log.py
+---------------
+Optional durable log of /analyze results, stored in a local SQLite database (WAL mode).
+
+What this file does:
+1) **AnalysisLog.submit()** hands per-message results to a bounded in-memory queue and
+   returns immediately. A single background thread drains the queue and writes rows in
+   batches (one transaction per batch), so request latency doesn't depend on disk I/O.
+   If the queue is full the batch is dropped and counted, never blocking the caller.
+   A failed batch write (e.g. "database is locked") is logged and counted the same way;
+   the writer keeps running.
+
+2) Rows are indexed on time, scam_type, risk_label and the DOMAIN / PHONE slots, so you
+   can audit "everything that mentioned this domain" without a separate pipeline.
+
+3) **AnalysisLog.counts()** returns time-bucketed counts. Unfiltered or
+   scam_type/risk_label-filtered queries read a per-minute rollup table maintained in the
+   same transaction as the inserts, so they stay fast at tens of millions of rows.
+   DOMAIN / PHONE filters use the (slot, ts) indexes on the raw table.
+
+Usage:
+    log = AnalysisLog("analysis_log.db")
+    log.submit([{"scam_type": ..., "risk_label": ..., "final_risk": ..., "slots": {...}, ...}])
+    log.counts(start, end, bucket_seconds=3600, by="scam_type")
+    log.close()   # flushes pending rows
+"""
+
+from __future__ import annotations
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rollup granularity; counts() buckets and range ends must be multiples of this when
+# served from rollups.
+ROLLUP_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL NOT NULL,
+    version     TEXT,
+    scam_type   TEXT,
+    risk_label  TEXT,
+    final_risk  REAL,
+    prob        REAL,
+    score       REAL,
+    domain      TEXT,
+    phone       TEXT,
+    amount      TEXT,
+    why         TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_analyses_ts ON analyses (ts);
+CREATE INDEX IF NOT EXISTS ix_analyses_scam_type ON analyses (scam_type, ts);
+CREATE INDEX IF NOT EXISTS ix_analyses_risk_label ON analyses (risk_label, ts);
+CREATE INDEX IF NOT EXISTS ix_analyses_domain ON analyses (domain, ts) WHERE domain IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_analyses_phone ON analyses (phone, ts) WHERE phone IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS analysis_counts (
+    bucket      INTEGER NOT NULL,   -- unix seconds, floored to ROLLUP_SECONDS
+    scam_type   TEXT NOT NULL,
+    risk_label  TEXT NOT NULL,
+    n           INTEGER NOT NULL,
+    PRIMARY KEY (bucket, scam_type, risk_label)
+) WITHOUT ROWID;
+"""
+
+_INSERT = """
+INSERT INTO analyses (ts, version, scam_type, risk_label, final_risk, prob, score, domain, phone, amount, why)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_COUNT = """
+INSERT INTO analysis_counts (bucket, scam_type, risk_label, n) VALUES (?, ?, ?, ?)
+ON CONFLICT (bucket, scam_type, risk_label) DO UPDATE SET n = n + excluded.n
+"""
+
+_GROUP_COLUMNS = ("scam_type", "risk_label")
+
+# Upper bound on buckets per counts() query, so one request can't return millions of rows.
+MAX_BUCKETS = 10000
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+# One `analyses` row, in _INSERT column order.
+_Row = Tuple[float, Optional[str], str, str, Any, Any, Any, Optional[str], Optional[str], Optional[str], str]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+    return conn
+
+
+class AnalysisLog:
+    """
+    Append-only store of per-message analysis results with a batched background writer.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10000, batch_size: int = 500, flush_interval: float = 0.5):
+        """
+        path:           SQLite database file (created if missing)
+        max_queue:      max pending submit() calls before new ones are dropped
+        batch_size:     max rows written per transaction
+        flush_interval: max seconds a row waits before its batch is written
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0  # rows lost to a full queue or a failed batch write
+        self._dropped_lock = threading.Lock()
+        self._closed = False
+
+        conn = _connect(path)
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._read_conn = _connect(path)
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="analysis-log-writer", daemon=True)
+        self._writer.start()
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def submit(self, results: List[Dict[str, Any]], ts: Optional[float] = None, version: Optional[str] = None) -> bool:
+        """
+        Queue one request's per-message results (dicts shaped like server.MessageResult).
+        Never blocks; returns False (and counts the drop) if the queue is full or the log
+        has been closed. Rows are encoded here, so a bad result can't take down the writer.
+        """
+        if not results:
+            return True
+        if self._closed:
+            self._count_dropped(len(results))
+            return False
+        ts = time.time() if ts is None else ts
+        rows: List[_Row] = []
+        for r in results:
+            slots = r.get("slots") or {}
+            rows.append((
+                ts, version, r.get("scam_type") or "Unknown", r.get("risk_label") or "Unknown",
+                r.get("final_risk"), r.get("prob"), r.get("score"),
+                slots.get("DOMAIN"), slots.get("PHONE"), slots.get("AMOUNT"),
+                json.dumps(r.get("why") or [], default=str),
+            ))
+        try:
+            self._queue.put_nowait(rows)
+            return True
+        except queue.Full:
+            self._count_dropped(len(rows))
+            return False
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Flush pending rows and stop the writer thread (waits at most ~2x `timeout`)."""
+        self._closed = True  # later submit() calls are counted as dropped
+        if self._writer.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning("analysis log queue still full after %ss; pending rows not flushed", timeout)
+            else:
+                self._writer.join(timeout)
+        with self._read_lock:
+            self._read_conn.close()
+
+    def _count_dropped(self, n: int) -> None:
+        with self._dropped_lock:
+            self.dropped += n
+
+    def _run(self) -> None:
+        conn = _connect(self.path)
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[_Row] = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.extend(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(conn, batch)
+                except Exception:
+                    # e.g. "database is locked" with several workers on one file; keep going.
+                    logger.exception("analysis log: failed to write %d rows", len(batch))
+                    self._count_dropped(len(batch))
+        conn.close()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, batch: List[_Row]) -> None:
+        rollup: Counter = Counter()
+        for row in batch:
+            rollup[(int(row[0]) // ROLLUP_SECONDS * ROLLUP_SECONDS, row[2], row[3])] += 1
+        with conn:
+            conn.executemany(_INSERT, batch)
+            conn.executemany(_UPSERT_COUNT, [(b, st, rl, n) for (b, st, rl), n in rollup.items()])
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def counts(self,
+               start: float,
+               end: float,
+               bucket_seconds: int = 3600,
+               scam_type: Optional[str] = None,
+               risk_label: Optional[str] = None,
+               domain: Optional[str] = None,
+               phone: Optional[str] = None,
+               by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Count logged messages in [start, end) per time bucket (unix seconds, floored to
+        `bucket_seconds`), optionally filtered and optionally split `by` scam_type or
+        risk_label. Returns [{"bucket": int, "key": str|None, "count": int}, ...] sorted
+        by bucket then key.
+
+        Without domain/phone filters, counts come from the per-minute rollup, so
+        bucket_seconds, start and end must all be multiples of ROLLUP_SECONDS.
+        Raises ValueError if the range spans more than MAX_BUCKETS buckets.
+        """
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        if by is not None and by not in _GROUP_COLUMNS:
+            raise ValueError(f"by must be one of {_GROUP_COLUMNS}")
+        if end <= start:
+            raise ValueError("end must be after start")
+        if (end - start) / bucket_seconds > MAX_BUCKETS:
+            raise ValueError(f"range covers more than {MAX_BUCKETS} buckets; use a wider bucket_seconds")
+
+        use_rollup = domain is None and phone is None
+        if use_rollup and any(v % ROLLUP_SECONDS for v in (bucket_seconds, start, end)):
+            raise ValueError(f"bucket_seconds, start and end must be multiples of {ROLLUP_SECONDS} "
+                             f"unless filtering by domain or phone")
+
+        where: List[str] = []
+        params: List[Any] = []
+        for col, val in (("scam_type", scam_type), ("risk_label", risk_label), ("domain", domain), ("phone", phone)):
+            if val is not None:
+                where.append(f"{col} = ?")
+                params.append(val)
+
+        if use_rollup:
+            time_col, count_expr, table = "bucket", "SUM(n)", "analysis_counts"
+        else:
+            time_col, count_expr, table = "ts", "COUNT(*)", "analyses"
+        where = [f"{time_col} >= ?", f"{time_col} < ?"] + where
+        params = [start, end] + params
+
+        key_col = by or "NULL"
+        sql = (
+            f"SELECT CAST({time_col} / ? AS INTEGER) * ? AS b, {key_col} AS k, {count_expr} "
+            f"FROM {table} WHERE {' AND '.join(where)} GROUP BY b, k ORDER BY b, k"
+        )
+        with self._read_lock:
+            cur = self._read_conn.execute(sql, [bucket_seconds, bucket_seconds] + params)
+            out = [{"bucket": int(b), "key": k, "count": int(n)} for b, k, n in cur.fetchall()]
+        return out
+
+
+# --- Quick demo (remove or keep for local testing) ---
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    db = os.path.join(tempfile.mkdtemp(), "analysis_log.db")
+    log = AnalysisLog(db)
+    now = time.time()
+    log.submit([
+        {"scam_type": "Tax Refund Scam", "risk_label": "Low", "final_risk": 0.35, "prob": 0.99, "score": 15.5,
+         "why": [["has_url", 3.89]], "slots": {"DOMAIN": "ram.com", "PHONE": None, "AMOUNT": "₹28,607"}},
+        {"scam_type": "WhatsApp Account Hacking Scam", "risk_label": "Low", "final_risk": 0.35, "prob": 0.99,
+         "score": 11.7, "why": [["mentions_otp", 3.89]], "slots": {"DOMAIN": None, "PHONE": None, "AMOUNT": None}},
+    ], ts=now, version="v1")
+    log.close()
+
+    log = AnalysisLog(db)
+    hour = int(now) // 3600 * 3600
+    print(log.counts(hour, hour + 3600, bucket_seconds=3600, by="scam_type"))
+    print(log.counts(now - 3600, now + 3600, bucket_seconds=60, domain="ram.com"))
+    log.close()
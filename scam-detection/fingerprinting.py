@@ -25,16 +25,25 @@ What it does:
    - predicted scam type
    - a "why" list of fired features
    - lightweight "slots" (amount/domain/phone) extracted for context/clustering
+3) Compact template-heavy datasets before fingerprinting: messages are canonicalized
+   (names, amounts, phones, URLs masked) and exact-template duplicates collapse into
+   weighted rows, so fingerprints are built from a few dozen rows instead of thousands.
+   CompactDataset.save() (or `python fingerprinting.py --compact in.json out.json`) writes
+   the compacted form; from_json_file() loads either form.
 """
 
 from __future__ import annotations
+import hashlib
 import json
 import math
+import os
 import re
+import warnings
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-from collections import Counter, defaultdict
+from collections import Counter
 
 
 # ----------------------------
@@ -123,6 +132,249 @@ def tokenize_words(text: str) -> List[str]:
     return toks
 
 
+# ----------------------------
+# Template compaction
+# ----------------------------
+
+# One left-to-right pass; at each position the first alternative that matches wins.
+_MASK_PARTS = (
+    r"(?P<URL>(?<![A-Za-z])(?i:https?)://\S+)",   # never split a letter run ("xhttp://")
+    r"(?P<HANDLE>\b[\w.\-]+(?=@\w))",                # local part of UPI IDs / emails
+    r"(?P<PHONE>\+?91[\s-]?\d{10}|\b\d{10}\b)",
+    r"(?P<AMOUNT>(?:₹|\b(?i:rs)\.?)\s*\d[\d,]*)",
+    r"(?P<NUM>\b\d[\d,]*\b)",
+    r"(?P<NAME>\b[A-Z][a-z]+(?:(?:-|,\s|\sand\s|\s)[A-Z][a-z]+)*\b)",
+)
+MASK_WITH_HANDLE_RE = re.compile("|".join(_MASK_PARTS))
+# HANDLE can start at any word character, which stops the regex engine from skipping
+# ahead; messages without "@" use this variant, gated on the possible first characters.
+MASK_RE = re.compile(r"(?=[hHrR₹+0-9A-Z])(?:" + "|".join(p for p in _MASK_PARTS if "HANDLE" not in p) + ")")
+# Placeholders contain no digits and are stripped before tokenizing, so they never
+# leak into keyword counts.
+PLACEHOLDER_RE = re.compile(r"\{[A-Z]+\}")
+SENTENCE_OPENERS = ".!?:\"'("
+FIRST_WORD_RE = re.compile(r"[A-Z][a-z]+")
+
+# Features implied by the placeholder itself; every other feature must survive masking.
+_STRUCTURAL_FEATURES = ("has_url", "has_phone", "has_amount")
+
+
+@lru_cache(maxsize=65536)
+def _fill_tokens(span: str) -> Optional[Tuple[str, ...]]:
+    """
+    Keyword tokens of a maskable span, or None if the span fires a keyword feature on
+    its own and so must stay verbatim. Cached: names, banks and domains repeat a lot.
+    """
+    feats = extract_features(span)
+    if any(v for k, v in feats.items() if k not in _STRUCTURAL_FEATURES):
+        return None
+    return tuple(tokenize_words(span))
+
+
+def canonicalize_message(text: str) -> Tuple[str, List[Tuple[str, ...]]]:
+    """
+    Mask the parts of a message that vary between copies of the same template
+    (URLs, UPI handles, phones, amounts, numbers, mid-sentence capitalised names).
+
+    Returns (template, fills): one list of keyword tokens per placeholder, in order, so
+    the template plus its fills tokenizes exactly like the original message.
+    Spans that fire a keyword feature (e.g. a name containing "upi") stay verbatim.
+    """
+    tx = _normalize_rupee(text)
+    fills: List[Tuple[str, ...]] = []
+    out: List[str] = []
+    pattern = MASK_WITH_HANDLE_RE if "@" in tx else MASK_RE
+    pos = 0
+    while True:
+        m = pattern.search(tx, pos)
+        if m is None:
+            break
+        kind = m.lastgroup
+        span = m.group(0)
+        out.append(tx[pos:m.start()])
+        pos = m.end()
+        if kind == "NAME":
+            # Capitalised words that open a sentence are template text, not names. Keep
+            # only that first word and rescan the rest ("Pay Rs.500" must still mask Rs.500).
+            i = m.start() - 1
+            while i >= 0 and tx[i].isspace():
+                i -= 1
+            if i < 0 or tx[i] in SENTENCE_OPENERS:
+                first = FIRST_WORD_RE.match(span).group(0)
+                out.append(first)
+                pos = m.start() + len(first)
+                continue
+        if kind in ("PHONE", "NUM"):
+            fills.append(())
+        else:
+            toks = _fill_tokens(span)
+            if toks is None:
+                out.append(span)
+                continue
+            fills.append(toks)
+        out.append("{" + str(kind) + "}")
+    out.append(tx[pos:])
+    return "".join(out), fills
+
+
+def template_tokens(template: str, fills: List[Dict[str, int]], weight: int = 1) -> Counter:
+    """
+    Keyword counts for a (weighted) template row: template text counts `weight` times,
+    fill tokens count as stored. Tokens are inserted in message order so ties in
+    Counter.most_common() still favour earlier words of the template.
+    """
+    counts: Counter = Counter()
+    pieces = PLACEHOLDER_RE.split(template)
+    for i, piece in enumerate(pieces):
+        for w in tokenize_words(piece):
+            counts[w] += weight
+        if i < len(fills):
+            counts.update(fills[i])
+    return counts
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class CompactRecord:
+    scamType: str
+    template: str
+    message: str                     # first raw message seen for this row (feature source)
+    weight: int                      # number of source rows collapsed into this one
+    fillTokens: List[Dict[str, int]]  # per placeholder: masked keyword tokens summed over rows
+
+
+@dataclass
+class CompactDataset:
+    rows: List[CompactRecord]
+    sourceCount: int
+    sourcePath: Optional[str] = None    # raw dataset this was built from, relative to the compact file
+    sourceSha256: Optional[str] = None  # digest of that file when it was compacted
+
+    @property
+    def compression_ratio(self) -> float:
+        """Source rows per compacted row (1.0 means no template redundancy)."""
+        return self.sourceCount / len(self.rows) if self.rows else 1.0
+
+    @staticmethod
+    def from_records(records: List[Dict[str, Any]]) -> "CompactDataset":
+        """
+        Collapse rows that share (scam_type, canonical template, feature vector) into
+        weighted rows. The feature vector is part of the key because masking can change
+        features that span a mask boundary ("Processing fee" vs "Service fee").
+        Rows with an empty message are dropped, as in FingerprintSet.from_records.
+        """
+        by_key: Dict[Tuple[str, str, Tuple[bool, ...]], CompactRecord] = {}
+        source = 0
+        for r in records:
+            msg = str(r.get("message", "") or "")
+            scam_type = str(r.get("scam_type", "") or "Unknown")
+            if not msg.strip():
+                continue
+            source += 1
+            template, fills = canonicalize_message(msg)
+            key = (scam_type, template, tuple(extract_features(msg).values()))
+            row = by_key.get(key)
+            if row is None:
+                row = CompactRecord(scamType=scam_type, template=template, message=msg,
+                                    weight=0, fillTokens=[{} for _ in fills])
+                by_key[key] = row
+            row.weight += 1
+            for slot, toks in zip(row.fillTokens, fills):
+                for w in toks:
+                    slot[w] = slot.get(w, 0) + 1
+        return CompactDataset(rows=list(by_key.values()), sourceCount=source)
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "CompactDataset":
+        rows = [
+            CompactRecord(scamType=r["scamType"],
+                          template=r["template"],
+                          message=r["message"],
+                          weight=int(r["weight"]),
+                          fillTokens=[{k: int(v) for k, v in slot.items()} for slot in r.get("fillTokens", [])])
+            for r in data.get("rows", [])
+        ]
+        return CompactDataset(rows=rows,
+                              sourceCount=int(data.get("sourceCount", sum(r.weight for r in rows))),
+                              sourcePath=data.get("sourcePath"),
+                              sourceSha256=data.get("sourceSha256"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sourceCount": self.sourceCount,
+            "sourcePath": self.sourcePath,
+            "sourceSha256": self.sourceSha256,
+            "rows": [
+                {
+                    "scamType": r.scamType,
+                    "template": r.template,
+                    "message": r.message,
+                    "weight": r.weight,
+                    "fillTokens": r.fillTokens,
+                } for r in self.rows
+            ],
+        }
+
+    def stale_source(self, compact_path: str) -> Optional[str]:
+        """
+        Path of the raw dataset if it still exists next to `compact_path` but no longer
+        matches the recorded digest (i.e. it was edited without re-running --compact).
+        """
+        if not self.sourcePath or not self.sourceSha256:
+            return None
+        src = os.path.join(os.path.dirname(os.path.abspath(compact_path)), self.sourcePath)
+        if os.path.exists(src) and _sha256_file(src) != self.sourceSha256:
+            return src
+        return None
+
+    def save(self, path: str) -> None:
+        """Write the compacted dataset; FingerprintSet.from_json_file reads it back."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    def group_counts(self) -> Dict[str, Tuple[int, Counter, Counter]]:
+        """
+        Per scam_type: (row count, feature counts, keyword counts), each row counting
+        `weight` times. Keywords are inserted in message order.
+        """
+        groups: Dict[str, Tuple[int, Counter, Counter]] = {}
+        for row in self.rows:
+            n, feat_counts, tokens = groups.get(row.scamType, (0, Counter(), Counter()))
+            for k, v in extract_features(row.message).items():
+                feat_counts[k] += row.weight if v else 0
+            tokens.update(template_tokens(row.template, row.fillTokens, row.weight))
+            groups[row.scamType] = (n + row.weight, feat_counts, tokens)
+        return groups
+
+    def mismatches(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Compare against the plain per-row counts of `records` (the dataset this was
+        compacted from). Returns one line per scam_type whose counts differ; empty if
+        compaction is lossless.
+        """
+        per_row = CompactDataset(
+            rows=[CompactRecord(scamType=str(r.get("scam_type", "") or "Unknown"),
+                                template="", message=msg, weight=1,
+                                fillTokens=[dict(Counter(tokenize_words(msg)))])
+                  for r in records
+                  for msg in [str(r.get("message", "") or "")] if msg.strip()],
+            sourceCount=0,
+        ).group_counts()
+        compact = self.group_counts()
+        out = []
+        for scam_type in sorted(set(per_row) | set(compact)):
+            if per_row.get(scam_type) != compact.get(scam_type):
+                out.append(f"{scam_type}: compacted counts differ from per-row counts")
+        return out
+
+
 # ----------------------------
 # Fingerprint structures
 # ----------------------------
@@ -144,61 +396,68 @@ class FingerprintItem:
 class FingerprintSet:
     version: str
     items: List[FingerprintItem]
+    compressionRatio: float = 1.0  # source rows per compacted template row
 
     @staticmethod
     def from_records(records: List[Dict[str, Any]], version: str = "v1") -> "FingerprintSet":
         """
         Build fingerprints by grouping dataset rows by scam_type and averaging feature presence.
         Also collect top keywords (for human-readable summaries).
+        Rows are compacted into weighted templates first; see CompactDataset.
+
+        Note: on raw rows this is slower than plain per-row extraction (every row is
+        canonicalized and still needs its feature vector for the compaction key). The
+        speedup comes from loading a pre-built compacted file via from_json_file().
         """
-        # Group messages by scam_type
-        groups: Dict[str, List[str]] = defaultdict(list)
-        for r in records:
-            msg = str(r.get("message", "") or "")
-            scam_type = str(r.get("scam_type", "") or "Unknown")
-            if msg.strip():
-                groups[scam_type].append(msg)
+        return FingerprintSet.from_compact(CompactDataset.from_records(records), version=version)
 
+    @staticmethod
+    def from_compact(compact: CompactDataset, version: str = "v1") -> "FingerprintSet":
+        """
+        Build fingerprints from weighted template rows. Each row counts `weight` times
+        towards feature prevalence and keyword counts.
+        """
         items: List[FingerprintItem] = []
 
-        for scam_type, msgs in groups.items():
-            # Compute feature prevalence per feature
-            feat_counts = Counter()
-            all_feats_keys = set()
-            for m in msgs:
-                f = extract_features(m)
-                all_feats_keys.update(f.keys())
-                for k, v in f.items():
-                    if v:
-                        feat_counts[k] += 1
-            n = len(msgs)
-            prevalence = {k: (feat_counts.get(k, 0) / n) for k in sorted(all_feats_keys)}
-
-            # Compute top keywords
-            tokens: List[str] = []
-            for m in msgs:
-                tokens.extend(tokenize_words(m))
-            top_kw = [w for w, _ in Counter(tokens).most_common(10)]
+        for scam_type, (n, feat_counts, tokens) in compact.group_counts().items():
+            # Feature prevalence per feature
+            prevalence = {k: (feat_counts.get(k, 0) / n) for k in sorted(feat_counts)}
+
+            # Top keywords
+            top_kw = [w for w, _ in tokens.most_common(10)]
 
             items.append(FingerprintItem(scamType=scam_type,
                                          featurePrevalence=prevalence,
                                          topKeywords=top_kw))
 
-        return FingerprintSet(version=version, items=items)
+        return FingerprintSet(version=version, items=items,
+                              compressionRatio=round(compact.compression_ratio, 2))
 
     @staticmethod
     def from_json_file(path: str, version: Optional[str] = None) -> "FingerprintSet":
         """
-        Load list-of-dicts dataset from a JSON file and build fingerprints.
+        Load a dataset from a JSON file and build fingerprints.
+        Accepts either the raw list-of-dicts dataset or a file written by CompactDataset.save().
+        A compacted file whose raw source has changed since it was built is ignored (with a
+        warning) and fingerprints are rebuilt from the source instead.
         """
         with open(path, "r", encoding="utf-8") as f:
-            records = json.load(f)
+            data = json.load(f)
         ver = version or "v1"
-        return FingerprintSet.from_records(records, version=ver)
+        if isinstance(data, dict):
+            compact = CompactDataset.from_dict(data)
+            stale = compact.stale_source(path)
+            if stale is None:
+                return FingerprintSet.from_compact(compact, version=ver)
+            warnings.warn(f"{path} is stale: {stale} changed since it was compacted; rebuilding from {stale}. "
+                          f"Re-run: python fingerprinting.py --compact {stale} {path}")
+            return FingerprintSet.from_json_file(stale, version=ver)
+        return FingerprintSet.from_records(data, version=ver)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "version": self.version,
+            "compressionRatio": self.compressionRatio,
             "items": [
                 {
                     "scamType": it.scamType,
@@ -276,10 +535,52 @@ class FingerprintClassifier:
             return 1.0 if score > 0 else 0.0
 
 
+def _compact_file(src: str, dst: str) -> int:
+    """CLI: compact a list-of-dicts dataset into `dst`, refusing to write a lossy result."""
+    with open(src, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    compact = CompactDataset.from_records(records)
+    compact.sourcePath = os.path.relpath(os.path.abspath(src), os.path.dirname(os.path.abspath(dst)))
+    compact.sourceSha256 = _sha256_file(src)
+    problems = compact.mismatches(records)
+    if problems:
+        print("\n".join(problems))
+        return 1
+    compact.save(dst)
+    print(f"{compact.sourceCount} rows -> {len(compact.rows)} rows "
+          f"(compression ratio {compact.compression_ratio:.2f}), written to {dst}")
+    return 0
+
+
+def _self_check() -> int:
+    """CLI: compaction must be lossless on inputs that stress the masks' edges."""
+    records = [
+        {"scam_type": "X", "message": "Visit xhttp://evil.com now"},
+        {"scam_type": "X", "message": "Visit yhttp://good.com now"},
+        {"scam_type": "X", "message": "Visit http://good.com/Axis now"},
+        {"scam_type": "X", "message": "Please pay the Processing fee now"},
+        {"scam_type": "X", "message": "Please pay the Service fee now"},
+        {"scam_type": "Y", "message": "Pay Rs.500 to Rupinder at rupinder@upi or 9876543210."},
+        {"scam_type": "Y", "message": "Pay ₹500 to Meera at meera_k@upi or +91 9876543210."},
+        {"scam_type": "Y", "message": "Hey, this is Udupi Travels. Your ref is AB12cd34 and id x91 9876543210."},
+    ]
+    problems = CompactDataset.from_records(records).mismatches(records)
+    print("\n".join(problems) if problems else "OK: compaction is lossless")
+    return 1 if problems else 0
+
+
 # ----------------------------
 # Quick usage demo
 # ----------------------------
 if __name__ == "__main__":
+    # Compact a dataset:  python fingerprinting.py --compact data.json data.compact.json
+    # Check compaction:   python fingerprinting.py --self-check
+    import sys
+    if len(sys.argv) == 4 and sys.argv[1] == "--compact":
+        sys.exit(_compact_file(sys.argv[2], sys.argv[3]))
+    if len(sys.argv) == 2 and sys.argv[1] == "--self-check":
+        sys.exit(_self_check())
+
     # Example records (shortened). Replace with your full list or load from file:
     records = [
       {
@@ -3,8 +3,9 @@
 from fingerprinting import FingerprintSet, FingerprintClassifier
 from risk_assessor import RiskAssessor, scam_risk_index
 
-# 1) Load fingerprints (from JSON you generated / stored)
-fps = FingerprintSet.from_json_file("data.json", version="v1")
+# 1) Load fingerprints (from JSON you generated / stored; the compacted file is built with
+#    `python fingerprinting.py --compact data.json data.compact.json`)
+fps = FingerprintSet.from_json_file("data.compact.json", version="v1")
 clf = FingerprintClassifier(fps)
 
 assessor = RiskAssessor()
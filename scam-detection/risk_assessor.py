@@ -21,18 +21,34 @@ still use the same `RiskAssessor.combine()` interface.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any, Tuple
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 
-# --- Optional ML baseline (scikit-learn). You can ignore if you don't need it now. ---
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.linear_model import LogisticRegression
+if TYPE_CHECKING:
     from sklearn.pipeline import Pipeline
-    from sklearn.calibration import CalibratedClassifierCV
-    import joblib  # for save/load
-    _HAS_SKLEARN = True
-except Exception:
-    _HAS_SKLEARN = False
+
+# --- Optional ML baseline (scikit-learn). You can ignore if you don't need it now. ---
+# scikit-learn and joblib are heavy to import, and RiskAssessor / scam_risk_index don't
+# need them, so they are only imported once an MLTextModel is built or loaded.
+_SKLEARN_MISSING = "scikit-learn is not installed. Install with: pip install scikit-learn joblib"
+
+
+def _import_sklearn():
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.calibration import CalibratedClassifierCV
+    except Exception as e:
+        raise ImportError(_SKLEARN_MISSING) from e
+    return TfidfVectorizer, LogisticRegression, Pipeline, CalibratedClassifierCV
+
+
+def _import_joblib():
+    try:
+        import joblib  # for save/load
+    except Exception as e:
+        raise ImportError(_SKLEARN_MISSING) from e
+    return joblib
 
 
 @dataclass
@@ -122,13 +138,12 @@ class MLTextModel:
         model = MLTextModel.load("risk_model.joblib")
 
     Notes:
-      - Requires scikit-learn + joblib.
+      - Requires scikit-learn + joblib (imported on first construction/load).
       - CalibratedClassifierCV improves probability quality for blending.
     """
 
     def __init__(self):
-        if not _HAS_SKLEARN:
-            raise ImportError("scikit-learn is not installed. Install with: pip install scikit-learn joblib")
+        TfidfVectorizer, LogisticRegression, Pipeline, CalibratedClassifierCV = _import_sklearn()
 
         # Char n-grams help with noisy text (misspellings, numbers).
         self.pipeline: Pipeline = Pipeline([
@@ -159,14 +174,13 @@ class MLTextModel:
         return [float(p[1]) for p in proba]
 
     def save(self, path: str) -> None:
-        joblib.dump(self.pipeline, path)
+        _import_joblib().dump(self.pipeline, path)
 
     @staticmethod
     def load(path: str) -> "MLTextModel":
-        if not _HAS_SKLEARN:
-            raise ImportError("scikit-learn is not installed. Install with: pip install scikit-learn joblib")
+        _import_sklearn()  # unpickling the pipeline needs scikit-learn importable
         m = MLTextModel.__new__(MLTextModel)
-        m.pipeline = joblib.load(path)
+        m.pipeline = _import_joblib().load(path)
         return m
 
 
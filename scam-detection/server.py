@@ -4,6 +4,8 @@ FastAPI app that:
 - Classifies a small batch of messages (5–10 typical) via FingerprintClassifier
 - Blends final risk with RiskAssessor
 - Returns per-message results and a batch SRI
+- Optionally appends every result to a local SQLite log (see analysis_log.py) and serves
+  time-bucketed counts from it
 
 Run:
     uvicorn main:app --reload
@@ -12,18 +14,22 @@ Swagger UI:
     http://127.0.0.1:8000/docs
 """
 
+import os
+import time
 from typing import List, Optional, Any, Dict
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from fingerprinting import FingerprintSet, FingerprintClassifier
 from risk_assessor import RiskAssessor, scam_risk_index
+from analysis_log import AnalysisLog
 
 # -------------------------
 # Config
 # -------------------------
-FINGERPRINTS_PATH = "data.json"   # <-- your JSON (list-of-dicts) dataset path
+FINGERPRINTS_PATH = "data.compact.json"  # <-- compacted dataset (python fingerprinting.py --compact data.json data.compact.json)
 FINGERPRINTS_VERSION = "v1"       # version label you want to attach
+ANALYSIS_LOG_PATH = os.environ.get("ANALYSIS_LOG_PATH")  # e.g. "analysis_log.db"; unset = no logging
 
 # -------------------------
 # App + models
@@ -52,16 +58,26 @@ class AnalyzeResponse(BaseModel):
     sri: float
     results: List[MessageResult]
 
+class CountBucket(BaseModel):
+    bucket: int                 # bucket start, unix seconds
+    key: Optional[str]          # scam_type / risk_label value when grouped, else null
+    count: int
+
+class CountsResponse(BaseModel):
+    bucket_seconds: int
+    buckets: List[CountBucket]
+
 
 # -------------------------
 # Startup: load fingerprints & init engines
 # -------------------------
 clf: Optional[FingerprintClassifier] = None
 assessor: Optional[RiskAssessor] = None
+analysis_log: Optional[AnalysisLog] = None
 
 @app.on_event("startup")
 def _startup() -> None:
-    global clf, assessor
+    global clf, assessor, analysis_log
     try:
         fps = FingerprintSet.from_json_file(FINGERPRINTS_PATH, version=FINGERPRINTS_VERSION)
     except Exception as e:
@@ -70,6 +86,17 @@ def _startup() -> None:
     clf = FingerprintClassifier(fps)
     assessor = RiskAssessor()  # default weights: rule=0.35, ml=0.5, url=0.15
 
+    if ANALYSIS_LOG_PATH:
+        analysis_log = AnalysisLog(ANALYSIS_LOG_PATH)
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    global analysis_log
+    log, analysis_log = analysis_log, None  # stop new submits before flushing
+    if log is not None:
+        log.close()  # flush pending rows; late submits are counted as dropped
+
 
 # -------------------------
 # Health
@@ -127,9 +154,47 @@ def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
     # 3) Compute a small-batch SRI for the set (useful summary for 5–10 msgs)
     sri = scam_risk_index(risks)
 
+    # 4) Hand results to the background log writer (non-blocking; no-op if disabled)
+    if analysis_log is not None:
+        analysis_log.submit([r.dict() for r in results], ts=time.time(), version=FINGERPRINTS_VERSION)
+
     return AnalyzeResponse(
         version=FINGERPRINTS_VERSION,
         count=len(results),
         sri=sri,
         results=results,
     )
+
+
+# -------------------------
+# Analysis log: time-bucketed counts
+# -------------------------
+@app.get("/analyses/counts", response_model=CountsResponse)
+def analysis_counts(
+    start: float = Query(..., description="Range start, unix seconds (inclusive)"),
+    end: float = Query(..., description="Range end, unix seconds (exclusive)"),
+    bucket_seconds: int = Query(3600, gt=0, description="Bucket width in seconds"),
+    scam_type: Optional[str] = None,
+    risk_label: Optional[str] = None,
+    domain: Optional[str] = Query(None, description="Filter on the DOMAIN slot"),
+    phone: Optional[str] = Query(None, description="Filter on the PHONE slot"),
+    by: Optional[str] = Query(None, description="Split counts by 'scam_type' or 'risk_label'"),
+) -> CountsResponse:
+    """
+    Count logged messages per time bucket, optionally filtered and grouped.
+    Without a domain/phone filter, start, end and bucket_seconds must be multiples of 60.
+    At most analysis_log.MAX_BUCKETS buckets per request ((end - start) / bucket_seconds).
+    Requires ANALYSIS_LOG_PATH to be set.
+    """
+    if analysis_log is None:
+        raise HTTPException(status_code=404, detail="Analysis log is disabled (set ANALYSIS_LOG_PATH)")
+    try:
+        rows = analysis_log.counts(start, end, bucket_seconds=bucket_seconds, scam_type=scam_type,
+                                   risk_label=risk_label, domain=domain, phone=phone, by=by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CountsResponse(
+        bucket_seconds=bucket_seconds,
+        buckets=[CountBucket(**r) for r in rows],
+    )
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+startup_check.py
+----------------
+Measure how long a fresh worker takes to become ready: `import server` plus
+`server._startup()` (fingerprint build + engine init), and fail if that goes over budget.
+
+Also fails if a heavy optional dependency (scikit-learn, joblib, pandas) got imported
+along the way - those must stay lazy so every worker and CLI run doesn't pay for them.
+
+Run:
+    python startup_check.py                 # default budget (STARTUP_BUDGET_S or 2.0s)
+    python startup_check.py --budget 0.8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+HEAVY_MODULES = ("sklearn", "joblib", "pandas")
+DEFAULT_BUDGET_S = float(os.environ.get("STARTUP_BUDGET_S", "2.0"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail if server import + startup exceeds a time budget.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S,
+                        help="Max seconds for import + _startup (default: %(default)s)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    import server
+    t1 = time.perf_counter()
+    server._startup()
+    t2 = time.perf_counter()
+
+    import_s, startup_s, total_s = t1 - t0, t2 - t1, t2 - t0
+    print(f"import server : {import_s:.3f}s")
+    print(f"_startup()    : {startup_s:.3f}s")
+    print(f"total         : {total_s:.3f}s  (budget {args.budget:.3f}s)")
+
+    ok = True
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        ok = False
+    if total_s > args.budget:
+        print(f"FAIL: startup took {total_s:.3f}s, over the {args.budget:.3f}s budget")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,24 @@
 #!/usr/bin/env python3
 
-import pandas as pd
+import csv
 import sys
+from collections import Counter
 
 def main():
 
     csv_file = "./whatsapp_scam_dataset.csv"
 
     try:
-        df = pd.read_csv(csv_file)
+        # Plain csv is enough to count one column; pandas costs far more to import.
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            column = [row[1] for row in reader if len(row) > 1 and row[1] != ""]
+
+        counts = Counter(column)
 
         # Get unique values from second column (index 1)
-        unique_items = sorted(df.iloc[:, 1].dropna().unique().tolist())
+        unique_items = sorted(counts)
 
         print("\n✅ Unique items from column 2:\n")
         for item in unique_items:
@@ -19,7 +26,8 @@ def main():
 
         # Also show counts
         print("\n📊 Value counts:\n")
-        print(df.iloc[:, 1].value_counts())
+        for item, count in counts.most_common():
+            print(f"{item}    {count}")
 
     except FileNotFoundError:
         print(f"Error: File '{csv_file}' not found.")